@@ -10,6 +10,8 @@ setup(
         "faster-whisper>=1.0.0",
         "sounddevice>=0.4.6",
         "numpy>=1.24.0",
+        "scipy>=1.10.0",
+        "soundfile>=0.12.0",
         "pynput>=1.7.6",
         "PyQt6>=6.5.0",
     ],
@@ -1,18 +1,29 @@
 import sys
+import queue
 import subprocess
+import threading
+from functools import lru_cache
 from pathlib import Path
 from PyQt6.QtWidgets import (QApplication, QSystemTrayIcon, QMenu,
                              QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLabel,
                              QPushButton, QDialog, QCheckBox, QLineEdit)
 from PyQt6.QtGui import QIcon, QAction
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal, QObject
 from pynput import keyboard
+import numpy as np
 
+from .audio import last_pause, warm_up
 from .config import Config, AVAILABLE_MODELS
 from .transcriber import Transcriber
-from .recorder import Recorder
+from .recorder import Recorder, MIN_DURATION, MIN_PEAK
 
 
+# Queue token asking the transcription thread for a partial result of the current recording
+_PARTIAL = object()
+
+# Partials decode speech a segment at a time; a segment with no pause is closed at this length
+PARTIAL_MAX_SEGMENT = 8  # seconds
+
 # Map pynput keys to readable names
 KEY_NAMES = {
     keyboard.Key.f1: "F1", keyboard.Key.f2: "F2", keyboard.Key.f3: "F3",
@@ -37,51 +48,75 @@ def get_key_name(key):
     return str(key)
 
 
-def key_matches_config(key, config_hotkey: str) -> bool:
-    """Check if a pressed key matches the configured hotkey"""
-    config_hotkey = config_hotkey.lower()
+# Hotkey config names -> pynput keys, built once at import
+_F_KEYS = {
+    f"f{i}": getattr(keyboard.Key, f"f{i}")
+    for i in range(1, 21) if hasattr(keyboard.Key, f"f{i}")
+}
 
-    # Check function keys
-    if config_hotkey.startswith("f") and config_hotkey[1:].isdigit():
-        fkey = getattr(keyboard.Key, config_hotkey, None)
-        if fkey and key == fkey:
-            return True
-
-    # Check special keys
-    special_map = {
-        "alt": keyboard.Key.alt,
-        "alt_l": keyboard.Key.alt_l,
-        "alt_r": keyboard.Key.alt_r,
-        "ctrl": keyboard.Key.ctrl,
-        "ctrl_l": keyboard.Key.ctrl_l,
-        "ctrl_r": keyboard.Key.ctrl_r,
-        "shift": keyboard.Key.shift,
-        "shift_l": keyboard.Key.shift_l,
-        "shift_r": keyboard.Key.shift_r,
-        "media_prev": keyboard.Key.media_previous,
-        "media_previous": keyboard.Key.media_previous,
-        "media_next": keyboard.Key.media_next,
-        "media_play": keyboard.Key.media_play_pause,
-        "scroll_lock": keyboard.Key.scroll_lock,
-        "pause": keyboard.Key.pause,
-        "insert": keyboard.Key.insert,
-    }
-    if config_hotkey in special_map and key == special_map[config_hotkey]:
-        return True
+_SPECIAL_MAP = {
+    "alt": keyboard.Key.alt,
+    "alt_l": keyboard.Key.alt_l,
+    "alt_r": keyboard.Key.alt_r,
+    "ctrl": keyboard.Key.ctrl,
+    "ctrl_l": keyboard.Key.ctrl_l,
+    "ctrl_r": keyboard.Key.ctrl_r,
+    "shift": keyboard.Key.shift,
+    "shift_l": keyboard.Key.shift_l,
+    "shift_r": keyboard.Key.shift_r,
+    "media_prev": keyboard.Key.media_previous,
+    "media_previous": keyboard.Key.media_previous,
+    "media_next": keyboard.Key.media_next,
+    "media_play": keyboard.Key.media_play_pause,
+    "scroll_lock": keyboard.Key.scroll_lock,
+    "pause": keyboard.Key.pause,
+    "insert": keyboard.Key.insert,
+}
 
+# Extra keys that also count as the configured hotkey
+_KEY_ALIASES = {
     # Alt matches both alt_l and alt_r
-    if config_hotkey == "alt" and key in (keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r):
-        return True
-
+    "alt": (keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r),
     # HP laptops map F9 to media_previous
-    if config_hotkey == "f9" and key == keyboard.Key.media_previous:
-        return True
+    "f9": (keyboard.Key.media_previous,),
+}
 
-    # Check character keys
-    if hasattr(key, 'char') and key.char and key.char.lower() == config_hotkey:
-        return True
 
-    return False
+def _compile_hotkey(config_hotkey: str):
+    """Compile the configured hotkey into (set of matching keys, char to match)"""
+    config_hotkey = config_hotkey.lower()
+    target_keys = set(_KEY_ALIASES.get(config_hotkey, ()))
+
+    if config_hotkey in _F_KEYS:
+        target_keys.add(_F_KEYS[config_hotkey])
+    if config_hotkey in _SPECIAL_MAP:
+        target_keys.add(_SPECIAL_MAP[config_hotkey])
+
+    return frozenset(target_keys), config_hotkey
+
+
+@lru_cache(maxsize=None)
+def _compile_matcher(config_hotkey: str):
+    """Build a key -> bool matcher specialized for the configured hotkey"""
+    target_keys, char_target = _compile_hotkey(config_hotkey)
+
+    # Runs on every global key press, so each case does a single comparison
+    if len(target_keys) == 1:
+        (target,) = target_keys
+        return lambda key: key is target
+    if target_keys:
+        return lambda key: key in target_keys
+
+    # Character keys
+    def match_char(key):
+        char = getattr(key, 'char', None)
+        return char is not None and char.lower() == char_target
+    return match_char
+
+
+def key_matches_config(key, config_hotkey: str) -> bool:
+    """Check if a pressed key matches the configured hotkey"""
+    return _compile_matcher(config_hotkey)(key)
 
 
 class HotkeySignal(QObject):
@@ -95,23 +130,12 @@ class StatusSignal(QObject):
     updated = pyqtSignal(str)
 
 
-class TranscribeWorker(QThread):
-    """Background thread for transcription"""
+class TranscribeSignal(QObject):
+    """Signal bridge for results from the transcription thread"""
     finished = pyqtSignal(str)
+    partial = pyqtSignal(str)
     error = pyqtSignal(str)
 
-    def __init__(self, transcriber, audio_path):
-        super().__init__()
-        self.transcriber = transcriber
-        self.audio_path = audio_path
-
-    def run(self):
-        try:
-            text = self.transcriber.transcribe(self.audio_path)
-            self.finished.emit(text)
-        except Exception as e:
-            self.error.emit(str(e))
-
 
 class HotkeyCapture(QDialog):
     """Dialog to capture a new hotkey"""
@@ -264,8 +288,8 @@ class WhisperDictateApp:
 
         self.config = Config()
         self.transcriber = Transcriber(self.config)
-        self.recorder = Recorder()
-        self.worker = None
+        self.recorder = Recorder(save_wav=self.config.get("debug_save_wav"),
+                                 buffer_seconds=self.config.get("record_buffer_seconds"))
         self.listener = None
 
         # Hotkey signal bridge (thread-safe)
@@ -277,6 +301,24 @@ class WhisperDictateApp:
         self.status_signal = StatusSignal()
         self.status_signal.updated.connect(self._on_status_update)
 
+        # Long-lived transcription thread fed through a queue
+        self.transcribe_signal = TranscribeSignal()
+        self.transcribe_signal.finished.connect(self._on_transcription_done)
+        self.transcribe_signal.partial.connect(self._on_partial_transcription)
+        self.transcribe_signal.error.connect(self._on_transcription_error)
+        self._transcribe_queue = queue.Queue()
+        self._transcribe_thread = threading.Thread(target=self._transcribe_loop, daemon=True)
+        self._transcribe_thread.start()
+
+        # Re-decode the audio so far while the hotkey is held (simulated streaming)
+        self._partial_pending = False
+        # Transcription-thread state: recording generation, first undecoded frame, text so far
+        self._partial_generation = None
+        self._partial_start = 0
+        self._partial_text = ""
+        self._partial_timer = QTimer()
+        self._partial_timer.timeout.connect(self._request_partial)
+
         self._setup_tray()
         self._setup_hotkey()
 
@@ -341,15 +383,16 @@ class WhisperDictateApp:
             self.listener.stop()
 
         hotkey_config = self.config.get("hotkey")
+        matches = _compile_matcher(hotkey_config)
 
         def on_press(key):
-            if key_matches_config(key, hotkey_config):
+            if matches(key):
                 if not self.recorder.is_recording:
                     print(f"[DEBUG] Hotkey pressed: {key}")
                     self.hotkey_signal.pressed.emit()
 
         def on_release(key):
-            if key_matches_config(key, hotkey_config):
+            if matches(key):
                 if self.recorder.is_recording:
                     print(f"[DEBUG] Hotkey released: {key}")
                     self.hotkey_signal.released.emit()
@@ -383,6 +426,8 @@ class WhisperDictateApp:
                 self.transcriber = transcriber
 
             def run(self):
+                # Import scipy here, off the GUI thread, instead of on the first hotkey release
+                warm_up()
                 # Connect status callback
                 self.transcriber.on_status = lambda msg: self.status.emit(msg)
                 self.transcriber.load_model()
@@ -402,22 +447,120 @@ class WhisperDictateApp:
         self.tray.showMessage("Recording", "Speak now...",
                              QSystemTrayIcon.MessageIcon.Information, 1000)
 
+        interval = self.config.get("partial_interval")
+        if interval:
+            self._partial_timer.start(interval)
+
     def _on_hotkey_released(self):
         """Stop recording when hotkey is released"""
         print("[DEBUG] Stopping recording (hotkey released)...")
-        audio_path = self.recorder.stop()
-        print(f"[DEBUG] Audio saved to: {audio_path}")
-        if not audio_path:
+        self._partial_timer.stop()
+        generation = self.recorder.generation
+        audio = self.recorder.stop()
+        if not audio:
             self._update_status_text()
             return
 
         model = self.transcriber.current_model or self.config.model
         self.status_action.setText(f"Transcribing with {model}...")
 
-        self.worker = TranscribeWorker(self.transcriber, audio_path)
-        self.worker.finished.connect(self._on_transcription_done)
-        self.worker.error.connect(self._on_transcription_error)
-        self.worker.start()
+        self._transcribe_queue.put((generation, audio))
+
+    def _request_partial(self):
+        """Queue a partial transcription unless one is still in flight"""
+        # Never let a partial trigger a model load racing the LoadWorker. Moonshine only:
+        # faster-whisper pads every call to 30 s, so even short segments cost a full encoder pass
+        if self._partial_pending or self.transcriber.engine != "sherpa":
+            return
+        self._partial_pending = True
+        self._transcribe_queue.put(_PARTIAL)
+
+    def _transcribe_loop(self):
+        """Transcribe queued (generation, (audio, sample_rate)) recordings until a None sentinel"""
+        while True:
+            item = self._transcribe_queue.get()
+            if item is None:
+                return
+            if item is _PARTIAL:
+                self._transcribe_partial()
+                continue
+
+            # Each recording is decoded and delivered on its own, so one failure or a
+            # backlog never holds back the others
+            try:
+                self.transcribe_signal.finished.emit(self._transcribe_final(*item))
+            except Exception as e:
+                self.transcribe_signal.error.emit(str(e))
+
+    def _transcribe_final(self, generation, audio) -> str:
+        """Transcribe a finished recording, reusing the segments partials already decoded"""
+        samples, sample_rate = audio
+        prefix = ""
+        if generation == self._partial_generation:
+            # Only the audio after the last decoded segment still needs the model
+            prefix = self._partial_text
+            samples = samples[self._partial_start * sample_rate // self.recorder.sample_rate:]
+            self._partial_generation = None
+            if len(samples) < MIN_DURATION * sample_rate or np.max(np.abs(samples)) < MIN_PEAK:
+                return prefix
+
+        text = self.transcriber.transcribe((samples, sample_rate))
+        return f"{prefix} {text}".strip()
+
+    def _transcribe_partial(self):
+        """Decode the newly closed speech segment, if any, and emit the text so far"""
+        try:
+            # The model may have been switched since the request was queued
+            if self.transcriber.engine != "sherpa":
+                return
+
+            generation = self.recorder.generation
+            if generation != self._partial_generation:
+                self._partial_generation = generation
+                self._partial_start = 0
+                self._partial_text = ""
+
+            snapshot = self.recorder.snapshot(self._partial_start)
+            if snapshot is None or snapshot[0] != generation:
+                return
+            _, end, (audio, sample_rate) = snapshot
+
+            # Each sample is decoded once: only audio up to the last pause (or a capped
+            # segment) is decoded, and the rest waits for a later tick or the final pass
+            cut = last_pause(audio, sample_rate, MIN_PEAK)
+            if cut is None:
+                if len(audio) < PARTIAL_MAX_SEGMENT * sample_rate:
+                    return
+                cut = len(audio)
+            segment = audio[:cut]
+
+            # A finished recording waiting in the queue goes first (it decodes this segment itself)
+            if not self._transcribe_queue.empty():
+                return
+
+            # Silence needs no decode; the segment is only marked done once it has text or is silent
+            if np.max(np.abs(segment)) >= MIN_PEAK:
+                text = self.transcriber.transcribe((segment, sample_rate), quiet=True)
+                if text:
+                    self._partial_text = f"{self._partial_text} {text}".strip()
+            if cut == len(audio):
+                self._partial_start = end
+            else:
+                self._partial_start += cut * self.recorder.sample_rate // sample_rate
+
+            # Drop the display update if the key was released and pressed again meanwhile
+            if self._partial_text and generation == self.recorder.generation:
+                self.transcribe_signal.partial.emit(self._partial_text)
+        except Exception as e:
+            print(f"[DEBUG] Partial transcription failed: {e}")
+        finally:
+            self._partial_pending = False
+
+    def _on_partial_transcription(self, text):
+        if not text or not self.recorder.is_recording:
+            return
+        print(f"[DEBUG] Partial: '{text}'")
+        self.status_action.setText(f"Recording... {text[-60:]}")
 
     def _on_transcription_done(self, text):
         print(f"[DEBUG] Transcription done: '{text}'")
@@ -432,19 +575,8 @@ class WhisperDictateApp:
         clipboard = self.app.clipboard()
         clipboard.setText(text)
 
-        # Auto-paste if enabled
+        # Auto-paste if enabled (the Qt clipboard above already owns the selection)
         if self.config.get("auto_paste"):
-            import time
-
-            # Copy to clipboard
-            subprocess.run(
-                ["xclip", "-selection", "clipboard"],
-                input=text.encode(),
-                check=True
-            )
-
-            time.sleep(0.1)
-
             # Detect if focused window is a browser
             try:
                 # Get active window ID
@@ -468,7 +600,8 @@ class WhisperDictateApp:
             if is_browser:
                 # Type out for web terminals (paste doesn't work reliably)
                 print(f"[DEBUG] Typing out for browser: {text[:50]}...")
-                subprocess.run(["xdotool", "type", "--clearmodifiers", "--delay", "5", "--", text])
+                type_delay = str(self.config.get("type_delay"))
+                subprocess.run(["xdotool", "type", "--clearmodifiers", "--delay", type_delay, "--", text])
             else:
                 # Paste for native terminals (faster)
                 paste_cmd = self.config.get("paste_command")
@@ -518,6 +651,8 @@ class WhisperDictateApp:
     def _quit(self):
         if self.listener:
             self.listener.stop()
+        self._transcribe_queue.put(None)
+        self.config.flush()
         self.app.quit()
 
     def run(self):
@@ -0,0 +1,41 @@
+from math import gcd
+import numpy as np
+
+# Moonshine and Whisper both run at 16 kHz
+MODEL_SAMPLE_RATE = 16000
+
+# Silence at least this long closes a speech segment
+PAUSE_DURATION = 0.3  # seconds
+
+
+def resample(audio: np.ndarray, from_rate: int, to_rate: int = MODEL_SAMPLE_RATE) -> np.ndarray:
+    """Resample mono float32 audio with scipy's polyphase (anti-aliased) FIR"""
+    if from_rate == to_rate:
+        return audio
+
+    from scipy.signal import resample_poly
+
+    g = gcd(from_rate, to_rate)
+    return resample_poly(audio, to_rate // g, from_rate // g).astype(np.float32, copy=False)
+
+
+def warm_up():
+    """Import scipy.signal and run a tiny resample so the first recording doesn't pay for it"""
+    resample(np.zeros(48, dtype=np.float32), 48000)
+
+
+def last_pause(audio: np.ndarray, sample_rate: int, threshold: float):
+    """Sample index where the last pause in audio ends (its peak stayed below threshold), or None"""
+    hop = sample_rate // 100  # 10 ms
+    hops = len(audio) // hop
+    needed = int(PAUSE_DURATION * 100)
+    if hops < needed:
+        return None
+
+    quiet = np.abs(audio[:hops * hop]).reshape(hops, hop).max(axis=1) < threshold
+    # runs[i] is True when hops i .. i+needed-1 are all quiet
+    runs = np.convolve(quiet, np.ones(needed, dtype=int), mode='valid') == needed
+    starts = np.flatnonzero(runs)
+    if not len(starts):
+        return None
+    return int(starts[-1] + needed) * hop
@@ -1,8 +1,11 @@
 import json
+import os
+import threading
 from pathlib import Path
 
 CONFIG_DIR = Path.home() / ".config" / "whisper-dictate"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+SAVE_DELAY = 0.5  # seconds; set() calls within this window share one write
 
 AVAILABLE_MODELS = {
     "moonshine-base":   {"ram": "~430MB",  "speed": "very fast", "accuracy": "~92%", "engine": "sherpa"},
@@ -11,14 +14,21 @@ AVAILABLE_MODELS = {
 DEFAULT_CONFIG = {
     "model": "moonshine-base",
     "compute_type": "int8",
+    "language": "en",  # None to auto-detect per utterance
     "hotkey": "f9",
     "auto_paste": True,
     "paste_command": "ctrl+shift+v",  # For terminal
+    "type_delay": 0,  # ms between characters when typing into browsers
+    "partial_interval": 500,  # ms between partial-result checks while recording (Moonshine only), 0 = off
+    "record_buffer_seconds": 60,  # Preallocated recording buffer; longer takes still work
+    "debug_save_wav": False,  # Also write each recording to a temp WAV file
 }
 
 class Config:
     def __init__(self):
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._save_timer = None
         self.load()
 
     def load(self):
@@ -30,15 +40,33 @@ class Config:
             self.save()
 
     def save(self):
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(self._data, f, indent=2)
+        # Write to a temp file and rename so a crash can't leave a truncated config
+        tmp_file = CONFIG_FILE.with_suffix(".json.tmp")
+        with self._lock:
+            with open(tmp_file, "w") as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(tmp_file, CONFIG_FILE)
+
+    def flush(self):
+        """Write any pending changes now"""
+        with self._lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+        self.save()
 
     def get(self, key):
         return self._data.get(key)
 
     def set(self, key, value):
-        self._data[key] = value
-        self.save()
+        with self._lock:
+            self._data[key] = value
+            # Debounce: restart the timer so a burst of changes is written once
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._save_timer.start()
 
     @property
     def model(self):
@@ -1,33 +1,51 @@
 import sounddevice as sd
 import numpy as np
 import tempfile
-import wave
 import threading
+from .audio import MODEL_SAMPLE_RATE, resample
+
+# Recordings quieter or shorter than this are treated as accidental taps
+MIN_PEAK = 0.01
+MIN_DURATION = 0.2  # seconds
 
 class Recorder:
-    def __init__(self):
+    def __init__(self, save_wav: bool = False, buffer_seconds: int = 60):
         # Use DMIC (device 2) with correct settings for HP laptop
         self.device = 2  # acp DMIC
         self.sample_rate = 48000
         self.channels = 2  # DMIC requires stereo
         self.recording = False
-        self.audio_data = []
+        # Preallocated capture buffer (~23 MB for 60 s of 48 kHz stereo float32);
+        # longer recordings spill into per-chunk copies in _overflow
+        self._buffer = np.empty((buffer_seconds * self.sample_rate, self.channels), dtype=np.float32)
+        self._write = 0
+        self._overflow = []
+        self._generation = 0  # Bumped per recording so stale snapshots can be told apart
         self.stream = None
         self._lock = threading.Lock()
+        self.save_wav = save_wav  # Debug: also dump each recording to a WAV file
 
         print(f"[DEBUG] Recorder initialized: device={self.device}, rate={self.sample_rate}, channels={self.channels}")
 
     def start(self):
         """Start recording from microphone"""
         with self._lock:
-            self.audio_data = []
+            self._write = 0
+            self._overflow = []
+            self._generation += 1
             self.recording = True
 
         def callback(indata, frames, time, status):
             if status:
                 print(f"[DEBUG] Recording status: {status}")
             if self.recording:
-                self.audio_data.append(indata.copy())
+                # Keep _write and _overflow consistent for snapshot() readers
+                with self._lock:
+                    n = min(frames, len(self._buffer) - self._write)
+                    np.copyto(self._buffer[self._write:self._write + n], indata[:n])
+                    self._write += n
+                    if n < frames:
+                        self._overflow.append(indata[n:].copy())
 
         self.stream = sd.InputStream(
             device=self.device,
@@ -38,8 +56,8 @@ class Recorder:
         )
         self.stream.start()
 
-    def stop(self) -> str:
-        """Stop recording and return path to WAV file"""
+    def stop(self):
+        """Stop recording and return (float32 mono audio, sample_rate)"""
         with self._lock:
             self.recording = False
 
@@ -48,30 +66,81 @@ class Recorder:
             self.stream.close()
             self.stream = None
 
-        if not self.audio_data:
+        with self._lock:
+            frames = self._captured()
+
+        if not len(frames):
             print("[DEBUG] No audio data captured!")
             return None
 
-        # Combine all audio chunks
-        audio = np.concatenate(self.audio_data, axis=0)
+        print(f"[DEBUG] Audio samples: {len(frames)}, duration: {len(frames)/self.sample_rate:.2f}s, sample_rate: {self.sample_rate}")
 
-        # Convert stereo to mono by averaging channels
-        if len(audio.shape) > 1 and audio.shape[1] == 2:
-            audio = np.mean(audio, axis=1)
+        audio, sample_rate = self._to_model_input(frames)
+
+        # Skip the model entirely for silent or too-short recordings
+        peak = float(np.max(np.abs(audio)))
+        if len(audio) < MIN_DURATION * sample_rate or peak < MIN_PEAK:
+            print(f"[DEBUG] Skipping recording: duration {len(audio)/sample_rate:.2f}s, peak {peak:.4f}")
+            return None
 
-        print(f"[DEBUG] Audio samples: {len(audio)}, duration: {len(audio)/self.sample_rate:.2f}s, sample_rate: {self.sample_rate}")
+        if self.save_wav:
+            print(f"[DEBUG] Audio saved to: {self._save_wav(audio, sample_rate)}")
+
+        return audio, sample_rate
+
+    def snapshot(self, start: int = 0):
+        """Return (generation, end_frame, (float32 mono audio, sample_rate)) for frames captured since start, or None"""
+        # Copy under the lock so a new start() can't reset the buffer while it is being read
+        with self._lock:
+            if not self.recording:
+                return None
+            frames = self._captured(start)
+            if not self._overflow:
+                frames = frames.copy()  # Otherwise it is already a fresh concatenation
+            generation = self._generation
+
+        if not len(frames):
+            return None
+        return generation, start + len(frames), self._to_model_input(frames)
+
+    def _captured(self, start: int = 0):
+        """Frames captured since start (a view into the buffer unless it overflowed); hold self._lock"""
+        frames = self._buffer[min(start, self._write):self._write]
+        if not self._overflow:
+            return frames
+
+        # Only copy the overflow chunks that reach past start
+        chunks = [frames]
+        offset = self._write
+        for chunk in self._overflow:
+            if offset + len(chunk) > start:
+                chunks.append(chunk[max(0, start - offset):])
+            offset += len(chunk)
+        return np.concatenate(chunks)
+
+    def _to_model_input(self, frames):
+        """Downmix and resample captured frames for the model"""
+        # Downmix the captured frames to mono
+        audio = np.mean(frames, axis=1, dtype=np.float32)
+
+        # Downsample once here so the model sees 3x fewer samples (48 kHz -> 16 kHz)
+        return resample(audio, self.sample_rate), MODEL_SAMPLE_RATE
+
+    def _save_wav(self, audio, sample_rate: int) -> str:
+        """Save audio as a 16-bit WAV file for debugging"""
+        import soundfile as sf
 
         temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
 
-        # Save as 16-bit WAV (standard format for speech APIs)
-        with wave.open(temp_file.name, 'wb') as wf:
-            wf.setnchannels(1)  # Mono
-            wf.setsampwidth(2)  # 16-bit
-            wf.setframerate(self.sample_rate)
-            wf.writeframes((audio * 32767).astype(np.int16).tobytes())
+        # libsndfile scales, rounds and clips to int16 in C, without numpy temporaries
+        sf.write(temp_file.name, audio, sample_rate, subtype='PCM_16')
 
         return temp_file.name
 
     @property
     def is_recording(self):
         return self.recording
+
+    @property
+    def generation(self):
+        return self._generation
@@ -1,9 +1,8 @@
-from faster_whisper import WhisperModel
-from huggingface_hub import scan_cache_dir
 from pathlib import Path
 import os
-import wave
+import threading
 import numpy as np
+from .audio import MODEL_SAMPLE_RATE, resample
 from .config import Config, AVAILABLE_MODELS
 
 # Moonshine model paths
@@ -13,6 +12,10 @@ MOONSHINE_MODELS = {
     "moonshine-base": "sherpa-onnx-moonshine-base-en-int8",
 }
 
+# Inference threads for both engines: roughly one per physical core (cpu_count is logical),
+# capped because small models lose to thread sync overhead beyond that
+NUM_THREADS = min(max(1, (os.cpu_count() or 4) // 2), 6)
+
 class Transcriber:
     def __init__(self, config: Config):
         self.config = config
@@ -20,6 +23,8 @@ class Transcriber:
         self._current_model_name = None
         self.on_status = None  # Callback for status updates
         self._sherpa_recognizer = None  # For Moonshine models
+        self._hf_downloaded = {}  # Memoized HuggingFace cache lookups
+        self._load_lock = threading.Lock()  # LoadWorker and the transcription thread may both load
 
     def _get_engine(self, model_name: str) -> str:
         """Get the engine type for a model"""
@@ -34,8 +39,17 @@ class Transcriber:
             model_dir = MODELS_DIR / MOONSHINE_MODELS[model_name]
             return model_dir.exists()
 
-        # Whisper models - check HuggingFace cache
+        # Whisper models - check HuggingFace cache (scanning walks the whole cache, so memoize)
+        if model_name not in self._hf_downloaded:
+            self._hf_downloaded[model_name] = self._scan_hf_cache(model_name)
+        return self._hf_downloaded[model_name]
+
+    @staticmethod
+    def _scan_hf_cache(model_name: str) -> bool:
+        """Check the HuggingFace cache for a Whisper model"""
         try:
+            from huggingface_hub import scan_cache_dir
+
             cache_info = scan_cache_dir()
             for repo in cache_info.repos:
                 if model_name in repo.repo_id:
@@ -56,18 +70,21 @@ class Transcriber:
         """Load or switch model"""
         model_name = model_name or self.config.model
 
-        if self._current_model_name == model_name:
-            return  # Already loaded
+        with self._load_lock:
+            if self._current_model_name == model_name:
+                return  # Already loaded
 
-        engine = self._get_engine(model_name)
+            engine = self._get_engine(model_name)
 
-        if engine == "sherpa":
-            self._load_moonshine(model_name)
-        else:
-            self._load_whisper(model_name)
+            if engine == "sherpa":
+                self._load_moonshine(model_name)
+            else:
+                self._load_whisper(model_name)
 
     def _load_moonshine(self, model_name: str):
         """Load a Moonshine model via sherpa-onnx"""
+        # Must be set before onnxruntime is first imported
+        os.environ.setdefault("OMP_NUM_THREADS", str(NUM_THREADS))
         import sherpa_onnx
 
         if model_name not in MOONSHINE_MODELS:
@@ -87,15 +104,22 @@ class Transcriber:
             uncached_decoder=str(model_dir / "uncached_decode.int8.onnx"),
             cached_decoder=str(model_dir / "cached_decode.int8.onnx"),
             tokens=str(model_dir / "tokens.txt"),
-            num_threads=4,
+            num_threads=NUM_THREADS,
         )
 
+        # Run one silent decode so onnxruntime's lazy init isn't paid on the first dictation
+        warm = self._sherpa_recognizer.create_stream()
+        warm.accept_waveform(MODEL_SAMPLE_RATE, np.zeros(MODEL_SAMPLE_RATE, dtype=np.float32))
+        self._sherpa_recognizer.decode_stream(warm)
+
         self.model = None  # Clear whisper model
         self._current_model_name = model_name
         self._update_status(f"Ready ({model_name})")
 
     def _load_whisper(self, model_name: str):
         """Load a Whisper model via faster-whisper"""
+        from faster_whisper import WhisperModel
+
         if not self.is_model_downloaded(model_name):
             self._update_status(f"Downloading {model_name}...")
         else:
@@ -104,14 +128,17 @@ class Transcriber:
         self.model = WhisperModel(
             model_name,
             device="cpu",
-            compute_type=self.config.get("compute_type")
+            compute_type=self.config.get("compute_type"),
+            cpu_threads=NUM_THREADS,
+            num_workers=1,
         )
+        self._hf_downloaded[model_name] = True  # Downloaded now if it wasn't before
         self._sherpa_recognizer = None  # Clear sherpa model
         self._current_model_name = model_name
         self._update_status(f"Ready ({model_name})")
 
-    def transcribe(self, audio_path: str) -> str:
-        """Transcribe audio file to text"""
+    def transcribe(self, audio, quiet: bool = False) -> str:
+        """Transcribe a WAV file path or an in-memory (audio, sample_rate) tuple to text"""
         model_name = self._current_model_name or self.config.model
 
         if not self.model and not self._sherpa_recognizer:
@@ -120,39 +147,55 @@ class Transcriber:
         engine = self._get_engine(model_name)
 
         if engine == "sherpa":
-            return self._transcribe_moonshine(audio_path)
+            samples, sample_rate = audio if isinstance(audio, tuple) else self._read_wav(audio)
+            return self._transcribe_moonshine(samples, sample_rate, quiet)
         else:
-            return self._transcribe_whisper(audio_path)
+            return self._transcribe_whisper(audio, quiet)
 
-    def _transcribe_moonshine(self, audio_path: str) -> str:
-        """Transcribe using Moonshine via sherpa-onnx"""
-        model_name = self._current_model_name
-        self._update_status(f"Transcribing with {model_name}...")
+    @staticmethod
+    def _read_wav(audio_path: str):
+        """Read a WAV file as float32 samples"""
+        import soundfile as sf
 
-        # Read audio file
-        with wave.open(audio_path, 'rb') as wf:
-            sample_rate = wf.getframerate()
-            num_frames = wf.getnframes()
-            audio_bytes = wf.readframes(num_frames)
+        # libsndfile decodes straight into a float32 buffer
+        return sf.read(audio_path, dtype='float32', always_2d=False)
 
-        # Convert to float32
-        audio = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+    def _transcribe_moonshine(self, audio: np.ndarray, sample_rate: int, quiet: bool = False) -> str:
+        """Transcribe using Moonshine via sherpa-onnx"""
+        model_name = self._current_model_name
+        if not quiet:
+            self._update_status(f"Transcribing with {model_name}...")
 
-        # Transcribe
+        # Offline streams can't be reset, so a fresh one is needed per utterance;
+        # a contiguous float32 array at least lets the binding skip its own copy
         stream = self._sherpa_recognizer.create_stream()
-        stream.accept_waveform(sample_rate, audio)
+        stream.accept_waveform(sample_rate, np.ascontiguousarray(audio, dtype=np.float32))
         self._sherpa_recognizer.decode_stream(stream)
 
         text = stream.result.text.strip()
         print(f"[DEBUG] Moonshine result: '{text}'")
         return text
 
-    def _transcribe_whisper(self, audio_path: str) -> str:
+    def _transcribe_whisper(self, audio, quiet: bool = False) -> str:
         """Transcribe using faster-whisper"""
         model_name = self._current_model_name
-        self._update_status(f"Transcribing with {model_name}...")
-
-        segments, _ = self.model.transcribe(audio_path)
+        if not quiet:
+            self._update_status(f"Transcribing with {model_name}...")
+
+        if isinstance(audio, tuple):
+            # faster-whisper takes numpy input as float32 at 16 kHz
+            samples, sample_rate = audio
+            audio = resample(samples, sample_rate)
+
+        # Short push-to-talk clips: fixed language skips detection, greedy decoding, no timestamps
+        segments, _ = self.model.transcribe(
+            audio,
+            language=self.config.get("language"),
+            beam_size=1,
+            vad_filter=False,
+            condition_on_previous_text=False,
+            without_timestamps=True,
+        )
         text = "".join(seg.text for seg in segments).strip()
         return text
 
@@ -166,3 +209,10 @@ class Transcriber:
     @property
     def current_model(self) -> str:
         return self._current_model_name
+
+    @property
+    def engine(self) -> str:
+        """Engine of the loaded model, or None while no model is ready"""
+        if self._current_model_name is None:
+            return None
+        return self._get_engine(self._current_model_name)